@@ -1,10 +1,202 @@
+import asyncio
+import hashlib
+import io
+from datetime import date
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 
 st.set_page_config(page_title="NOAA 기온 데이터 분석", layout="wide")
 
+# NOAA CSV 디스크 캐시 위치 (프로세스/컨테이너가 바뀌어도 재사용)
+CACHE_DIR = Path.home() / ".cache" / "noaa"
+
+# NOAA 요청 설정 (연결 풀 크기, 연결 오류 시 재시도 횟수/대기 시간)
+HTTP_POOL_SIZE = 4
+HTTP_RETRIES = 1
+HTTP_BACKOFF = 0.1
+
+# 차트에 그릴 최대 점 개수 (이보다 많으면 LTTB로 다운샘플링)
+MAX_PLOT_POINTS = 2000
+
+
+def _read_csv(data):
+    """CSV 바이트를 pyarrow로 파싱해 DataFrame으로 변환"""
+    # 캐시 미스일 때만 필요하므로 여기서 import
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+
+    # 멀티스레드 파싱 + 알려진 칼럼은 바로 타입 지정
+    read_options = pacsv.ReadOptions(use_threads=True, block_size=1 << 20)
+    convert_options = pacsv.ConvertOptions(
+        column_types={
+            "date": pa.timestamp("ns"),
+            "anomaly": pa.float32(),
+            "TAVG": pa.float32(),
+            "TMEAN": pa.float32(),
+        }
+    )
+    table = pacsv.read_csv(
+        io.BytesIO(data),
+        read_options=read_options,
+        convert_options=convert_options,
+    )
+    return table.to_pandas()
+
+
+def _prepare(df_try):
+    """원본 CSV에서 date / value 두 칼럼만 뽑아 정리"""
+    first = df_try.iloc[:, 0]
+    # Arrow가 이미 날짜로 파싱했다면 다시 변환하지 않음
+    if pd.api.types.is_datetime64_any_dtype(first):
+        df_try["date"] = first
+    else:
+        df_try["date"] = pd.to_datetime(first, errors="coerce")
+    df_try = df_try.dropna(subset=["date"])
+    df_try = df_try[df_try["date"] <= pd.Timestamp.today()]
+
+    # 값 칼럼 찾기 (TAVG → TMEAN → 두 번째 칼럼 순)
+    valcol = next((c for c in ("TAVG", "TMEAN") if c in df_try.columns), df_try.columns[1])
+    values = df_try[valcol]
+    # 이미 숫자형이면 변환 생략
+    if not pd.api.types.is_numeric_dtype(values):
+        values = pd.to_numeric(values, errors="coerce")
+    df_try["value"] = values
+
+    df_final = df_try.dropna(subset=["value"])
+    if df_final.empty:
+        raise ValueError("사용 가능한 값이 없음")
+    df_final = df_final[["date", "value"]].reset_index(drop=True)
+    # 기온 이상치는 float32로 충분 (메모리/직렬화 비용 절반)
+    df_final["value"] = df_final["value"].astype(np.float32)
+    return df_final
+
+
+async def _fetch_first_ok(urls):
+    """
+    모든 URL을 동시에 요청(gzip 전송)하고,
+    가장 먼저 정상적으로 파싱된 (url, DataFrame)을 반환
+    """
+    import aiohttp
+
+    timeout = aiohttp.ClientTimeout(total=10)
+    headers = {"Accept-Encoding": "gzip"}
+    # 하나의 연결 풀을 공유해 같은 호스트는 keep-alive 연결과 DNS 결과를 재사용
+    connector = aiohttp.TCPConnector(limit=HTTP_POOL_SIZE, ttl_dns_cache=300)
+    async with aiohttp.ClientSession(
+        connector=connector, timeout=timeout, headers=headers
+    ) as session:
+
+        async def get(url):
+            for attempt in range(HTTP_RETRIES + 1):
+                try:
+                    async with session.get(url) as resp:
+                        resp.raise_for_status()
+                        return await resp.read()
+                except aiohttp.ClientConnectionError:
+                    if attempt == HTTP_RETRIES:
+                        raise
+                    await asyncio.sleep(HTTP_BACKOFF * 2**attempt)
+
+        async def fetch(url):
+            body = await get(url)
+            # 파싱은 스레드에서 실행해 다른 다운로드를 막지 않음
+            df_try = await asyncio.to_thread(_read_csv, body)
+            return url, _prepare(df_try)
+
+        pending = {asyncio.ensure_future(fetch(url)) for url in urls}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+    return None
+
+
+def _cache_path(url):
+    """URL + 오늘 날짜로 parquet 캐시 파일 경로 생성"""
+    key = hashlib.sha256((url + date.today().isoformat()).encode("utf-8")).hexdigest()
+    return CACHE_DIR / f"{key}.parquet"
+
+
+def _cached_fetch(urls):
+    """
+    parquet 디스크 캐시를 먼저 확인하고,
+    없을 때만 네트워크에서 CSV를 내려받음 (실패 시 None)
+    """
+    for url in urls:
+        path = _cache_path(url)
+        if path.exists():
+            return pd.read_parquet(path)
+
+    try:
+        result = asyncio.run(_fetch_first_ok(urls))
+    except Exception:
+        return None
+    if result is None:
+        return None
+
+    url, df = result
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        df.to_parquet(_cache_path(url))
+    except Exception:
+        # 캐시 저장 실패는 무시 (다음 실행에서 다시 내려받음)
+        pass
+    return df
+
+
+def _lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets 다운샘플링
+    모양을 유지하는 n_out개 점의 인덱스를 반환
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    # 첫 점과 마지막 점을 제외한 구간을 n_out - 2개 버킷으로 나눔
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0] = 0
+    idx[-1] = n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # 다음 버킷 평균점 (마지막 버킷이면 마지막 점)
+        nhi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[hi:nhi].mean()
+        avg_y = y[hi:nhi].mean()
+        # 이전 선택점 - 후보점 - 다음 버킷 평균점이 이루는 삼각형 넓이
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+
+def _example_data():
+    """모두 실패 시 fallback 예시 데이터"""
+    # 2000-01부터 240개월의 월말 날짜 (다음 달 1일 - 1일)
+    months = np.datetime64("2000-01", "M") + np.arange(1, 241)
+    dates = (months.astype("datetime64[D]") - np.timedelta64(1, "D")).astype("datetime64[ns]")
+    values = np.sin(np.linspace(0, 20, 240)) + np.random.normal(0, 0.2, 240)
+    values = values.astype(np.float32)
+    return pd.DataFrame({"date": dates, "value": values})
+
+
 # ==========================
 # NOAA 데이터 로딩 함수
 # ==========================
@@ -21,32 +213,65 @@ def load_noaa_data():
         "https://www.ncei.noaa.gov/metadata/geoportal/rest/metadata/item/gov.noaa.ncdc%3AC00946/html",
         "https://catalog.data.gov/dataset/monthly-summaries-of-the-global-historical-climatology-network-daily-ghcn-d2",
     ]
-    for url in urls:
-        try:
-            df_try = pd.read_csv(url)
-            df_try["date"] = pd.to_datetime(df_try.iloc[:, 0], errors="coerce")
-            df_try = df_try.dropna(subset=["date"])
-            df_try = df_try[df_try["date"] <= pd.Timestamp.today()]
-
-            # 값 칼럼 찾기
-            if "TAVG" in df_try.columns:
-                df_try["value"] = pd.to_numeric(df_try["TAVG"], errors="coerce")
-            elif "TMEAN" in df_try.columns:
-                df_try["value"] = pd.to_numeric(df_try["TMEAN"], errors="coerce")
-            else:
-                valcol = df_try.columns[1]
-                df_try["value"] = pd.to_numeric(df_try[valcol], errors="coerce")
-
-            df_final = df_try.dropna(subset=["value"])
-            return df_final[["date", "value"]], True
-        except Exception:
-            continue
-
-    # 모두 실패 시 fallback 예시 데이터
-    dates = pd.date_range("2000-01-01", periods=240, freq="M")
-    values = np.sin(np.linspace(0, 20, 240)) + np.random.normal(0, 0.2, 240)
-    df = pd.DataFrame({"date": dates, "value": values})
-    return df, False
+    df = _cached_fetch(urls)
+    from_noaa = df is not None
+    if not from_noaa:
+        df = _example_data()
+
+    # 연도는 캐시된 데이터에서 한 번만 계산 (NumPy 캐스팅)
+    df["year"] = df["date"].to_numpy().astype("datetime64[Y]").astype(np.int64) + 1970
+    return df, from_noaa
+
+
+# ==========================
+# 통계 계산 함수
+# ==========================
+@st.cache_data
+def describe_values(df):
+    """
+    value 칼럼 기초 통계
+    describe()와 같은 항목을 NumPy로 한 번에 계산
+    """
+    a = df["value"].to_numpy(dtype=np.float64)
+    a = a[~np.isnan(a)]
+    q = np.percentile(a, [0, 25, 50, 75, 100])
+    return pd.Series(
+        [a.size, a.mean(), a.std(ddof=1), *q],
+        index=["count", "mean", "std", "min", "25%", "50%", "75%", "max"],
+        name="value",
+    )
+
+
+@st.cache_data
+def correlate(df, cols):
+    """cols 간 피어슨 상관계수 행렬 (np.corrcoef 한 번으로 계산)"""
+    cols = list(cols)
+    a = df[cols].to_numpy(dtype=np.float64)
+    r = np.corrcoef(a, rowvar=False)
+    return pd.DataFrame(r, index=cols, columns=cols)
+
+
+# ==========================
+# 차트 생성 함수
+# ==========================
+@st.cache_resource
+def timeseries_figure(df):
+    """NOAA 시계열 WebGL 차트 (데이터가 바뀔 때만 새로 생성)"""
+    import plotly.graph_objects as go
+
+    plot_idx = _lttb(df["date"].to_numpy().astype(np.int64), df["value"].to_numpy(), MAX_PLOT_POINTS)
+    plot_df = df.iloc[plot_idx]
+    fig = go.Figure(
+        go.Scattergl(
+            x=plot_df["date"],
+            y=plot_df["value"],
+            mode="lines",
+            name="기온/이상치 값",
+            showlegend=True,
+        )
+    )
+    fig.update_layout(xaxis_title="날짜", yaxis_title="값", height=400)
+    return fig
 
 
 # ==========================
@@ -65,27 +290,21 @@ else:
 # 기초 통계
 # ==========================
 st.header("📊 기초 통계")
-desc = df["value"].describe()
+desc = describe_values(df)
 st.write(desc)
 
 # ==========================
 # 상관관계 분석 (시간 vs 값)
 # ==========================
 st.header("📈 상관관계 분석")
-df["year"] = df["date"].dt.year
-corr = df[["year", "value"]].corr()
+corr = correlate(df, ("year", "value"))
 st.write(corr)
 
 # ==========================
 # 시각화
 # ==========================
 st.header("📉 시각화")
-fig, ax = plt.subplots(figsize=(10, 4))
-ax.plot(df["date"], df["value"], label="기온/이상치 값")
-ax.set_xlabel("날짜")
-ax.set_ylabel("값")
-ax.legend()
-st.pyplot(fig)
+st.plotly_chart(timeseries_figure(df), use_container_width=True)
 
 # ==========================
 # 출처